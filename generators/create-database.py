@@ -1,7 +1,10 @@
+import functools
+import hashlib
+import json
 import os.path as _p
 import sys
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import jsonref  # type: ignore
 
@@ -17,10 +20,18 @@ class KVTableInfo:
     value_field: str
     inserted_at_field: str
     is_active_field: str
+    # False: one row per key, overwritten in place by set-value
+    keep_history: bool = True
 
 
 # --- Type Mappings and Constants ---
 
+# Minimal required fields for our KV table
+_KV_REQUIRED = frozenset({"key", "value", "inserted_at", "is_active"})
+
+# Marks the start of the indexes/triggers that may be deferred during bulk loads
+POST_LOAD_MARKER = "-- squeakyv:post-load"
+
 # Dictionary mapping standard JSON Schema types to common SQLite affinities
 SQLITE_TYPE_MAP = {
     "string": "TEXT",
@@ -34,6 +45,7 @@ SQLITE_TYPE_MAP = {
 # --- Core DDL Logic ---
 
 
+@functools.lru_cache(maxsize=None)
 def map_json_type_to_sqlite(json_type: str) -> str:
     """Maps a JSON Schema type string to a SQLite affinity."""
     # Use .get() to default to TEXT if an unknown type appears
@@ -46,21 +58,45 @@ def generate_column_constraints(
     required_list: List[str],
 ) -> str:
     """Generates the column-level constraints (NOT NULL, PRIMARY KEY, AUTOINCREMENT)."""
+    # Memoized on the hashable parts of col_def that affect the output;
+    # union types such as ["string", "null"] arrive as lists
+    json_type = col_def.get("type", "")
+    if isinstance(json_type, list):
+        json_type = tuple(json_type)
+    return _column_constraints(
+        col_name,
+        json_type,
+        col_def.get("sqlite:primaryKey") is True,
+        col_def.get("sqlite:default"),
+        col_def.get("sqlite:check"),
+        col_name in required_list,
+    )
+
+
+@functools.lru_cache(maxsize=10_000)
+def _column_constraints(
+    col_name: str,
+    json_type: Any,
+    primary_key: bool,
+    default_expr: Optional[str],
+    check_expr: Optional[str],
+    required: bool,
+) -> str:
     constraints = []
 
     # 1. NOT NULL constraint (based on parent schema's 'required' array)
-    if col_name in required_list:
+    if required:
         constraints.append("NOT NULL")
 
     # 2. PRIMARY KEY and AUTOINCREMENT
-    if col_def.get("sqlite:primaryKey") is True:
+    if primary_key:
         # SQLite best practice: INTEGER PRIMARY KEY implies AUTOINCREMENT (if specified)
         # Note: Your schema doesn't explicitly use AUTOINCREMENT, but it is a common
         # convention for single integer PKEYs in SQLite. We will use the explicit PKEY.
 
         # Check if it should be AUTOINCREMENT (e.g., explicit type integer for ID)
         if (
-            map_json_type_to_sqlite(col_def.get("type", "")) == "INTEGER"
+            map_json_type_to_sqlite(json_type) == "INTEGER"
             and "id" in col_name.lower()
         ):
             # Using the column name 'id' as a heuristic for auto-increment.
@@ -69,13 +105,11 @@ def generate_column_constraints(
             constraints.append("PRIMARY KEY")
 
     # 3. DEFAULT value (use raw SQL expression when provided)
-    if "sqlite:default" in col_def:
-        default_expr = col_def["sqlite:default"]
+    if default_expr is not None:
         constraints.append(f"DEFAULT ({default_expr})")
 
     # 4. CHECK constraint (raw SQL condition)
-    if "sqlite:check" in col_def:
-        check_expr = col_def["sqlite:check"]
+    if check_expr is not None:
         constraints.append(f"CHECK ({check_expr})")
 
     return " ".join(constraints)
@@ -107,19 +141,19 @@ def generate_create_table_ddl(table_name: str, table_schema: Dict[str, Any]) ->
         )
         constraints = generate_column_constraints(col_name, col_def, required_list)
 
-        col_ddl = ""
+        col_lines = []
 
         # Add column description comment (preceding the column definition line)
         col_desc = col_def.get("description")
         if col_desc:
             # Replace newlines in description for a cleaner DDL comment
             clean_desc = col_desc.replace("\n", " ").strip()
-            col_ddl += f"  -- {clean_desc}\n"
+            col_lines.append(f"  -- {clean_desc}")
 
         # Add the actual column definition line
-        col_ddl += f"  {col_name} {sql_type} {constraints}".rstrip()
+        col_lines.append(f"  {col_name} {sql_type} {constraints}".rstrip())
 
-        column_definitions.append(col_ddl)
+        column_definitions.append("\n".join(col_lines))
 
         # 2. Check for and collect FOREIGN KEY definitions
         fkey_target = col_def.get("sqlite:foreignKey")
@@ -138,38 +172,42 @@ def generate_create_table_ddl(table_name: str, table_schema: Dict[str, Any]) ->
                 pass
 
     # 3. Assemble the final DDL statement
-    ddl = ""
+    ddl_lines = []
     # Add Table Description (Multi-line comment)
     table_desc = table_schema.get("description")
     if table_desc:
-        ddl += f"/*\n * Table: {table_name}\n * Description: {table_desc}\n */\n"
+        ddl_lines.extend(
+            ["/*", f" * Table: {table_name}", f" * Description: {table_desc}", " */"]
+        )
 
     ddl_parts = column_definitions + foreign_key_constraints
-    ddl += f"CREATE TABLE IF NOT EXISTS {table_name} (\n"
-    ddl += ",\n".join(ddl_parts)
-    ddl += "\n);\n"
+    ddl_lines.append(f"CREATE TABLE IF NOT EXISTS {table_name} (")
+    ddl_lines.append(",\n".join(ddl_parts))
+    ddl_lines.append(");\n")
 
-    return ddl
+    return "\n".join(ddl_lines)
 
 
 def generate_metadata_inserts(
     metadata_table_name: str, schema_version: str, schema_tree_ish: str
 ) -> str:
     """
-    Generates the idempotent INSERT OR IGNORE statements for initial library metadata.
+    Generates the idempotent statements for initial library metadata.
 
     In a real system, schema_version and schema_tree_ish would be calculated
     by reading the environment or the source schema file.
     """
 
-    # We use INSERT OR IGNORE to ensure these are only run once
+    # The version rows are upserted so that re-running the script against an
+    # older database records the new version; creation_date is only set once
+    upsert = "ON CONFLICT(key) DO UPDATE SET value = excluded.value"
     inserts = [
         "\n/*",
         " * Initialization Data: Schema Version and Creation Date (Idempotent)",
-        " * These records are only inserted if they do not already exist.",
+        " * Version records are refreshed; the creation date is only inserted once.",
         " */",
-        f"INSERT OR IGNORE INTO {metadata_table_name} (key, value) VALUES ('schema_version', '{schema_version}');",
-        f"INSERT OR IGNORE INTO {metadata_table_name} (key, value) VALUES ('schema_tree_ish', '{schema_tree_ish}');",
+        f"INSERT INTO {metadata_table_name} (key, value) VALUES ('schema_version', '{schema_version}') {upsert};",
+        f"INSERT INTO {metadata_table_name} (key, value) VALUES ('schema_tree_ish', '{schema_tree_ish}') {upsert};",
         # Use SQLite function for the current timestamp
         f"INSERT OR IGNORE INTO {metadata_table_name} (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));",
     ]
@@ -190,35 +228,65 @@ def find_kv_table_info(master_schema: Dict[str, Any]) -> Optional[KVTableInfo]:
             if not isinstance(properties, dict):
                 continue
 
-            prop_names = set(properties.keys())
-            # Minimal required fields for our KV table
-            if {"key", "value", "inserted_at", "is_active"}.issubset(prop_names):
+            if all(field in properties for field in _KV_REQUIRED):
                 return KVTableInfo(
                     table_name=table_name,
                     key_field="key",
                     value_field="value",
                     inserted_at_field="inserted_at",
                     is_active_field="is_active",
+                    keep_history=table_schema.get("sqlite:keepHistory", True),
                 )
     return None
 
 
-def generate_kv_constraints(kv_info: KVTableInfo) -> str:
+def generate_kv_pre_load(kv_info: KVTableInfo) -> str:
+    """
+    Generates the KV objects that must exist while rows are loaded.
+
+    Without history, the key is unique across the whole table so set-value
+    can upsert in place; that index is required by the upsert itself.
+    """
+    unique_index_name = f"{kv_info.table_name}_{kv_info.key_field}"
+
+    ddl = ""
+    if not kv_info.keep_history:
+        ddl += f"""
+-- One row per key (no version history); set-value upserts in place
+CREATE UNIQUE INDEX IF NOT EXISTS {unique_index_name} ON {kv_info.table_name}({kv_info.key_field});
+"""
+
+    return ddl + f"""
+-- Convenience view
+CREATE VIEW IF NOT EXISTS {kv_info.table_name}_current AS
+  SELECT {kv_info.key_field}, {kv_info.value_field}, {kv_info.inserted_at_field}
+  FROM {kv_info.table_name}
+  WHERE {kv_info.is_active_field} = 1;
+"""
+
+
+def generate_kv_post_load(kv_info: KVTableInfo) -> str:
     """
-    Generates indexes and triggers for the key-value table based on schema info.
+    Generates the KV indexes and triggers that bulk loaders may drop and
+    recreate after ingestion, instead of maintaining them row by row.
     """
     # Generate constraint names based on table name
     active_index_name = f"{kv_info.table_name}_active_{kv_info.key_field}"
     time_index_name = f"{kv_info.table_name}_{kv_info.key_field}_time"
     trigger_name = f"{kv_info.table_name}_swap_active"
 
-    return f"""
--- Only one active row per key
-CREATE UNIQUE INDEX IF NOT EXISTS {active_index_name} ON {kv_info.table_name}({kv_info.key_field}) WHERE {kv_info.is_active_field} = 1;
-
+    time_index = f"""
 -- Time-travel and scans
 CREATE INDEX IF NOT EXISTS {time_index_name} ON {kv_info.table_name}({kv_info.key_field}, {kv_info.inserted_at_field});
+"""
+
+    if not kv_info.keep_history:
+        return time_index
 
+    return f"""
+-- Only one active row per key
+CREATE UNIQUE INDEX IF NOT EXISTS {active_index_name} ON {kv_info.table_name}({kv_info.key_field}) WHERE {kv_info.is_active_field} = 1;
+{time_index}
 -- Swap-out on overwrite: retire old active row just before insert
 CREATE TRIGGER IF NOT EXISTS {trigger_name}
 BEFORE INSERT ON {kv_info.table_name}
@@ -227,22 +295,28 @@ BEGIN
   UPDATE {kv_info.table_name} SET {kv_info.is_active_field} = 0
   WHERE {kv_info.key_field} = NEW.{kv_info.key_field} AND {kv_info.is_active_field} = 1;
 END;
-
--- Convenience view
-CREATE VIEW IF NOT EXISTS {kv_info.table_name}_current AS
-  SELECT {kv_info.key_field}, {kv_info.value_field}, {kv_info.inserted_at_field}
-  FROM {kv_info.table_name}
-  WHERE {kv_info.is_active_field} = 1;
 """
 
 
-def generate_table_ddl(master_schema: Dict[str, Any]) -> List[str]:
+def generate_kv_constraints(kv_info: KVTableInfo) -> str:
     """
-    Main entry point. Iterates through the top-level table schemas and generates DDL
-    and appends initialization data.
+    Generates indexes, triggers and views for the key-value table based on schema info.
+
+    Everything after POST_LOAD_MARKER is safe to drop before a bulk load and
+    recreate afterwards.
     """
-    ddl_statements = []
+    return (
+        generate_kv_pre_load(kv_info)
+        + f"\n{POST_LOAD_MARKER}\n"
+        + generate_kv_post_load(kv_info)
+    )
+
 
+def generate_table_ddl(master_schema: Dict[str, Any]) -> Iterator[str]:
+    """
+    Main entry point. Iterates through the top-level table schemas and yields DDL
+    followed by initialization data, one statement block at a time.
+    """
     # Track if we generated the metadata table DDL
     metadata_table_name: Optional[str] = None
 
@@ -252,22 +326,26 @@ def generate_table_ddl(master_schema: Dict[str, Any]) -> List[str]:
         if table_schema.get("type") == "array" and "items" in table_schema:
             try:
                 ddl = generate_create_table_ddl(table_name, table_schema)
-                ddl_statements.append(ddl)
+                yield ddl
 
                 if table_name == "__metadata__":
                     metadata_table_name = table_name
             except Exception as e:
-                ddl_statements.append(f"-- ERROR generating DDL for {table_name}: {e}")
+                yield f"-- ERROR generating DDL for {table_name}: {e}"
         else:
-            ddl_statements.append(
-                f"-- Skipping {table_name}: Not a recognized table structure."
-            )
+            yield f"-- Skipping {table_name}: Not a recognized table structure."
 
     # 2. Append Initialization Data if the metadata table was defined
     if metadata_table_name is not None:
-        # NOTE: In a real system, you would calculate these values from your build/environment.
-        # We use placeholders here to demonstrate the injection logic.
-        VERSION = "1.0.0"
+        # Clients skip the schema script when the stored schema_version matches,
+        # so the version carries a digest of the table schemas: any schema edit
+        # (e.g. flipping sqlite:keepHistory) re-runs the DDL on existing databases.
+        # Bump the base version when only the generator's DDL output changes.
+        schema_digest = hashlib.sha256(
+            json.dumps(master_schema, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        VERSION = f"1.0.0+{schema_digest}"
+        # NOTE: In a real system, you would calculate this from your build/environment.
         TREE_ISH = (
             "git-hash-abc123"  # e.g., git rev-parse HEAD or hash of the jsonnet file
         )
@@ -275,9 +353,7 @@ def generate_table_ddl(master_schema: Dict[str, Any]) -> List[str]:
         insert_statements = generate_metadata_inserts(
             metadata_table_name, VERSION, TREE_ISH
         )
-        ddl_statements.append(insert_statements)
-
-    return ddl_statements
+        yield insert_statements
 
 
 if __name__ == "__main__":
@@ -286,7 +362,9 @@ if __name__ == "__main__":
     assert _p.exists(json_schema_path)
 
     with open(json_schema_path) as ifile:
-        json_schema = jsonref.load(ifile)
+        # Substitute each $ref with its target once, instead of wrapping it in a
+        # lazy proxy that is re-dereferenced on every attribute access
+        json_schema = jsonref.load(ifile, proxies=False)
 
     for statement in generate_table_ddl(json_schema["properties"]):
         print(statement)
@@ -4,7 +4,6 @@ import sys
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-import jinja2  # type: ignore
 import jsonref  # type: ignore
 
 # --- Data Classes ---
@@ -19,10 +18,15 @@ class KVTableInfo:
     value_field: str
     inserted_at_field: str
     is_active_field: str
+    # False: one row per key, overwritten in place by set-value
+    keep_history: bool = True
 
 
 # --- PYTHON LOOKUP LOGIC ---
 
+# Minimal required fields for our KV table
+_KV_REQUIRED = frozenset({"key", "value", "inserted_at", "is_active"})
+
 
 def find_kv_table_info(master_schema: Dict[str, Any]) -> Optional[KVTableInfo]:
     """
@@ -38,53 +42,88 @@ def find_kv_table_info(master_schema: Dict[str, Any]) -> Optional[KVTableInfo]:
             if not isinstance(properties, dict):
                 continue
 
-            prop_names = set(properties.keys())
-            # Minimal required fields for our KV table
-            if {"key", "value", "inserted_at", "is_active"}.issubset(prop_names):
+            if all(field in properties for field in _KV_REQUIRED):
                 return KVTableInfo(
                     table_name=table_name,
                     key_field="key",
                     value_field="value",
                     inserted_at_field="inserted_at",
                     is_active_field="is_active",
+                    keep_history=table_schema.get("sqlite:keepHistory", True),
                 )
     return None
 
 
-# We embed the Jinja2 template string directly for convenience.
-# The template is now much cleaner, relying on pre-resolved variables.
-J2_TEMPLATE = jinja2.Template("""\
-{# This file uses Jinja2 syntax to generate the final YeSQL file dynamically. #}
+# --- YESQL TEMPLATE ---
+
+# Tags a query returning (key, value) rows; renderers whose generic SELECT
+# path only carries one column fold it into a single JSON object instead
+KEY_VALUE_ROWS_MARKER = "squeakyv:key-value-rows"
+
+
+
+def render_yesql(kv: KVTableInfo) -> str:
+    """Renders the YeSQL query file for the given KV table."""
+    if kv.keep_history:
+        set_value = f"""\
+-- name: set-value(key, value)!
+-- Sets a new value for a key (trigger handles deactivating old values)
+INSERT INTO {kv.table_name} ({kv.key_field}, {kv.value_field})
+VALUES (:key, :value);"""
+    else:
+        set_value = f"""\
+-- name: set-value(key, value)!
+-- Sets the value for a key, overwriting the existing row in place
+INSERT INTO {kv.table_name} ({kv.key_field}, {kv.value_field})
+VALUES (:key, :value)
+ON CONFLICT ({kv.key_field}) DO UPDATE SET
+  {kv.value_field} = excluded.{kv.value_field},
+  {kv.inserted_at_field} = excluded.{kv.inserted_at_field},
+  {kv.is_active_field} = 1;"""
+
+    return f"""
 
 -- ====================================================================
 -- Auto-generated Key-Value Access Queries (Single Table with Active Flag)
--- Table: {{ kv_info.table_name }}
+-- Table: {kv.table_name}
 -- ====================================================================
 
 -- name: get-current-value(key)^
 -- Retrieves the current active value for a key
-SELECT {{ kv_info.value_field }} -- , {{ kv_info.inserted_at_field }}
-FROM {{ kv_info.table_name }}
-WHERE {{ kv_info.key_field }} = :key AND {{ kv_info.is_active_field }} = 1;
+SELECT {kv.value_field} -- , {kv.inserted_at_field}
+FROM {kv.table_name}
+WHERE {kv.key_field} = :key AND {kv.is_active_field} = 1;
 
--- name: set-value(key, value)!
--- Sets a new value for a key (trigger handles deactivating old values)
-INSERT INTO {{ kv_info.table_name }} ({{ kv_info.key_field }}, {{ kv_info.value_field }})
-VALUES (:key, :value);
+-- name: get-many-values(keys)
+-- Retrieves the active (key, value) pairs for a JSON array of keys
+-- {KEY_VALUE_ROWS_MARKER}
+SELECT {kv.key_field}, {kv.value_field}
+FROM {kv.table_name}
+WHERE {kv.is_active_field} = 1 AND {kv.key_field} IN (SELECT value FROM json_each(:keys));
+
+{set_value}
 
 -- name: delete-key(key)!
 -- Soft deletes a key by setting is_active = 0
-UPDATE {{ kv_info.table_name }}
-SET {{ kv_info.is_active_field }} = 0
-WHERE {{ kv_info.key_field }} = :key AND {{ kv_info.is_active_field }} = 1;
+UPDATE {kv.table_name}
+SET {kv.is_active_field} = 0
+WHERE {kv.key_field} = :key AND {kv.is_active_field} = 1;
 
 -- name: list-active-keys()
 -- Lists all currently active keys
-SELECT {{ kv_info.key_field }} -- , {{ kv_info.inserted_at_field }}
-FROM {{ kv_info.table_name }}
-WHERE {{ kv_info.is_active_field }} = 1
-ORDER BY {{ kv_info.inserted_at_field }} DESC;
-""")
+SELECT {kv.key_field} -- , {kv.inserted_at_field}
+FROM {kv.table_name}
+WHERE {kv.is_active_field} = 1
+ORDER BY {kv.inserted_at_field} DESC;
+
+-- name: list-active-keys-with-prefix(prefix)
+-- Lists currently active keys starting with prefix
+-- (a key range rather than a string function, so the key index applies)
+SELECT {kv.key_field} -- , {kv.inserted_at_field}
+FROM {kv.table_name}
+WHERE {kv.is_active_field} = 1
+  AND {kv.key_field} >= :prefix AND {kv.key_field} < :prefix || char(1114111)
+ORDER BY {kv.inserted_at_field} DESC;"""
 
 
 if __name__ == "__main__":
@@ -93,11 +132,13 @@ if __name__ == "__main__":
     assert _p.exists(json_schema_path)
 
     with open(json_schema_path) as ifile:
-        json_schema_dict = jsonref.load(ifile)
+        # Substitute each $ref with its target once, instead of wrapping it in a
+        # lazy proxy that is re-dereferenced on every attribute access
+        json_schema_dict = jsonref.load(ifile, proxies=False)
 
     kv_info = find_kv_table_info(json_schema_dict.get("properties", {}))
     if not kv_info:
         print("ERROR: No KV table found in schema", file=sys.stderr)
         sys.exit(1)
 
-    print(J2_TEMPLATE.render(kv_info=kv_info))
+    print(render_yesql(kv_info))
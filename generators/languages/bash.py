@@ -5,11 +5,29 @@ import jinja2
 from aiosql.types import QueryFn, SQLOperationType
 
 
-def render(statements_map: Dict[str, QueryFn], schema_sql: Optional[str] = None) -> str:
+# Must match KEY_VALUE_ROWS_MARKER in generators/create-operations-yesql.py
+KEY_VALUE_ROWS_MARKER = "squeakyv:key-value-rows"
+
+
+def as_json_object_sql(sql: str) -> str:
+    """Fold a (key, value) rows query into one JSON object of hex-encoded values."""
+    inner = sql.strip().rstrip(";")
+    return (
+        f"WITH pairs(key, value) AS (\n{inner}\n)\n"
+        "SELECT json_group_object(key, hex(value)) FROM pairs;"
+    )
+
+
+def render(
+    statements_map: Dict[str, QueryFn],
+    schema_sql: Optional[str] = None,
+    debug: bool = False,
+) -> str:
     out: list[str] = []
 
     # Header
-    out.append('''\
+    # debug builds trace by default; tracing is still switchable at runtime
+    out.append(f'''\
 #!/usr/bin/env bash
 # Auto-generated SQLite operations for squeakyv (Bash)
 # DO NOT EDIT THIS FILE MANUALLY - it is generated by the build pipeline.
@@ -17,7 +35,7 @@ def render(statements_map: Dict[str, QueryFn], schema_sql: Optional[str] = None)
 
 set -euo pipefail
 
-SQUEAKYV_DEBUG="${SQUEAKYV_DEBUG:-0}"
+SQUEAKYV_DEBUG="${{SQUEAKYV_DEBUG:-{1 if debug else 0}}}"
 
 ''')
 
@@ -168,13 +186,17 @@ SQUEAKYV_SQL_EOF
 ''')
 
     for fname, qfn in statements_map.items():
-        func_info = get_function_info(fname, qfn.operation)
+        sql, operation = qfn.sql, qfn.operation
+        if KEY_VALUE_ROWS_MARKER in (qfn.__doc__ or ""):
+            # the generic paths below only carry a single column
+            sql, operation = as_json_object_sql(sql), SQLOperationType.SELECT_ONE
+        func_info = get_function_info(fname, operation)
 
         out.append(
             FUNCTION_TEMPLATE.render(
                 bash_func_name=func_info.bash_func_name,
                 parameters=qfn.parameters,
-                sql=qfn.sql.strip(),
+                sql=sql.strip(),
                 docstring=f"Execute {fname} operation",
                 execution_type=func_info.execution_type
             ).rstrip()
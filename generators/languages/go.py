@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass
 from typing import Dict, Optional
 
@@ -5,7 +6,25 @@ import jinja2
 from aiosql.types import QueryFn, SQLOperationType
 
 
-def render(statements_map: Dict[str, QueryFn], schema_sql: Optional[str] = None) -> str:
+# Must match KEY_VALUE_ROWS_MARKER in generators/create-operations-yesql.py
+KEY_VALUE_ROWS_MARKER = "squeakyv:key-value-rows"
+
+
+def as_json_object_sql(sql: str) -> str:
+    """Fold a (key, value) rows query into one JSON object of hex-encoded values."""
+    inner = sql.strip().rstrip(";")
+    return (
+        f"WITH pairs(key, value) AS (\n{inner}\n)\n"
+        "SELECT json_group_object(key, hex(value)) FROM pairs;"
+    )
+
+
+def render(
+    statements_map: Dict[str, QueryFn],
+    schema_sql: Optional[str] = None,
+    debug: bool = False,
+) -> str:
+    # debug: generated Go code has no tracing hooks, nothing to toggle
     out: list[str] = []
 
     # Package and imports
@@ -100,10 +119,14 @@ const SchemaSQL = `{escaped_sql}`
 
     # Convert named parameters to positional for SQLite
     def convert_to_positional_sql(sql: str, params: list[str]) -> str:
-        """Convert :param syntax to ? placeholders."""
+        """Convert :param syntax to numbered ?N placeholders.
+
+        Numbering follows the argument order, so a parameter that appears
+        more than once in the query is still bound from a single argument.
+        """
         result = sql
-        for param in params:
-            result = result.replace(f":{param}", "?")
+        for index, param in enumerate(params, start=1):
+            result = re.sub(rf":{param}\b", f"?{index}", result)
         return result
 
     FUNCTION_TEMPLATE = jinja2.Template('''\
@@ -116,7 +139,11 @@ func {{ funcName }}(db *sql.DB{{ paramDecls }}) {{ returnSig }} {
 ''')
 
     for fname, qfn in statements_map.items():
-        return_info = get_return_info(qfn.operation)
+        sql, operation = qfn.sql, qfn.operation
+        if KEY_VALUE_ROWS_MARKER in (qfn.__doc__ or ""):
+            # the generic paths below only carry a single column
+            sql, operation = as_json_object_sql(sql), SQLOperationType.SELECT_ONE
+        return_info = get_return_info(operation)
         func_name = "_" + snake_to_camel(fname.replace('-', '_'))
 
         # Build parameter declarations
@@ -134,7 +161,7 @@ func {{ funcName }}(db *sql.DB{{ paramDecls }}) {{ returnSig }} {
             args_array = "\targs := []interface{}{}"
 
         # Convert SQL to positional parameters
-        positional_sql = convert_to_positional_sql(qfn.sql.strip(), qfn.parameters)
+        positional_sql = convert_to_positional_sql(sql.strip(), qfn.parameters)
 
         out.append(
             FUNCTION_TEMPLATE.render(
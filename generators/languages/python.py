@@ -1,3 +1,5 @@
+import re
+import sqlite3
 from dataclasses import dataclass
 from typing import Dict, Optional
 
@@ -5,19 +7,87 @@ import jinja2
 from aiosql.types import QueryFn, SQLOperationType
 
 
-def render(statements_map: Dict[str, QueryFn], schema_sql: Optional[str] = None) -> str:
+# Must match POST_LOAD_MARKER in generators/create-database.py
+POST_LOAD_MARKER = "-- squeakyv:post-load"
+
+# Must match KEY_VALUE_ROWS_MARKER in generators/create-operations-yesql.py
+KEY_VALUE_ROWS_MARKER = "squeakyv:key-value-rows"
+
+
+def split_sql_statements(sql: str) -> list[str]:
+    """Split a SQL script into statements, dropping blank and comment-only lines."""
+    statements = []
+    current: list[str] = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        # complete_statement understands BEGIN...END trigger bodies
+        if sqlite3.complete_statement("\n".join(current)):
+            statements.append("\n".join(current))
+            current = []
+    return statements
+
+
+def strip_sql_comments(sql: str) -> str:
+    """Remove -- line comments (outside quoted literals) and blank lines."""
+    lines = []
+    for line in sql.splitlines():
+        quote = None
+        for i, ch in enumerate(line):
+            if quote:
+                if ch == quote:
+                    quote = None
+            elif ch in "'\"":
+                quote = ch
+            elif line.startswith("--", i):
+                line = line[:i]
+                break
+        line = line.rstrip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+# Quoted literals are matched first so placeholders inside them are left alone
+_NAMED_PARAM_RE = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|(?<![:\w]):([A-Za-z_]\w*)""")
+
+
+def to_positional(sql: str) -> tuple[str, list[str]]:
+    """Rewrite :name placeholders to ?, returning the names in binding order."""
+    names: list[str] = []
+
+    def replace(m: re.Match) -> str:
+        if m.group(1) is None:
+            return m.group(0)
+        names.append(m.group(1))
+        return "?"
+
+    return _NAMED_PARAM_RE.sub(replace, sql), names
+
+
+def render(
+    statements_map: Dict[str, QueryFn],
+    schema_sql: Optional[str] = None,
+    debug: bool = False,
+) -> str:
     out: list[str] = []
-    out.append('''\
+    header = '''\
 """
 Auto-generated SQLite operations for squeakyv.
 DO NOT EDIT THIS FILE MANUALLY - it is generated by the build pipeline.
 Source: generators/languages/python.py
 """
 import sqlite3
+from itertools import chain
 
-DEBUG_LEVEL = 0
-
-''')
+'''
+    if debug:
+        # Tracing is only compiled in for debug builds, keeping it off the hot path;
+        # like the bash target, a debug build traces by default
+        header += "DEBUG_LEVEL = 1\n\n"
+    out.append(header)
 
     # Add embedded schema SQL if provided
     if schema_sql:
@@ -25,21 +95,63 @@ DEBUG_LEVEL = 0
         escaped_sql = schema_sql.replace('\\', '\\\\').replace('"""', r'\"\"\"')
         out.append(f'# Embedded database schema\nSCHEMA_SQL = """\n{escaped_sql}\n"""\n\n')
 
+        # Lets clients recognise an already-initialized database
+        version_match = re.search(r"\('schema_version',\s*'([^']*)'\)", schema_sql)
+        if version_match:
+            out.append("# Schema version that SCHEMA_SQL records in __metadata__")
+            out.append(f'SCHEMA_VERSION = "{version_match.group(1)}"\n\n')
+
+        # Indexes and triggers that bulk loads may drop and rebuild afterwards
+        if POST_LOAD_MARKER in schema_sql:
+            post_load_sql = schema_sql.split(POST_LOAD_MARKER, 1)[1]
+            post_load = split_sql_statements(post_load_sql)
+            drops = [
+                f"DROP {m.group(1).upper()} IF EXISTS {m.group(2)}"
+                for stmt in post_load
+                if (m := re.match(
+                    r"CREATE\s+(?:UNIQUE\s+)?(INDEX|TRIGGER)\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+                    stmt,
+                    re.IGNORECASE,
+                ))
+            ]
+            out.append("# Post-load schema section, rebuilt after bulk loads")
+            out.append("SCHEMA_POST_LOAD_STATEMENTS = (")
+            for stmt in post_load:
+                escaped_stmt = stmt.replace('\\', '\\\\').replace('"""', r'\"\"\"')
+                out.append(f'    """\\\n{escaped_stmt}""",')
+            out.append(")")
+            out.append("SCHEMA_POST_LOAD_DROPS = (")
+            for drop in drops:
+                out.append(f'    "{drop}",')
+            out.append(")\n\n")
+
     @dataclass
     class ReturnInfo:
+        execute_line: str
         return_call: Optional[str]
         return_type: str
 
-    def get_return_info(operation: SQLOperationType) -> ReturnInfo:
+    def get_return_info(qfn: QueryFn) -> ReturnInfo:
         """Determine the appropriate return method based on SQL operation type."""
-        if operation == SQLOperationType.SELECT_ONE:
+        operation = qfn.operation
+        if KEY_VALUE_ROWS_MARKER in (qfn.__doc__ or ""):
             return ReturnInfo(
-                return_call="(row[0] if (row := cursor.fetchone()) is not None else None)",
+                execute_line="rows = conn.execute({statement}, parameters)",
+                # build the mapping straight from the (key, value) row tuples
+                return_call="dict(rows)",
+                return_type="dict[str, str | bytes]",
+            )
+        elif operation == SQLOperationType.SELECT_ONE:
+            return ReturnInfo(
+                execute_line="row = conn.execute({statement}, parameters).fetchone()",
+                return_call="row[0] if row is not None else None",
                 return_type="str | bytes | None",
             )
         elif operation == SQLOperationType.SELECT:
             return ReturnInfo(
-                return_call="[row[0] for row in cursor.fetchall()]",
+                execute_line="rows = conn.execute({statement}, parameters)",
+                # flatten 1-tuples in C rather than with a per-row Python loop
+                return_call="list(chain.from_iterable(rows))",
                 return_type="list[str]",
             )
         elif (
@@ -50,19 +162,27 @@ DEBUG_LEVEL = 0
             ]
             or True
         ):
-            return ReturnInfo(return_call=None, return_type="None")
+            return ReturnInfo(
+                execute_line="conn.execute({statement}, parameters)",
+                return_call=None,
+                return_type="None",
+            )
 
+    # SQL lives in module-level constants so each call only loads a global
     FUNCTION_TEMPLATE = jinja2.Template('''\
+{{ statement }} = """\
+{{ sql }}"""
+
+
 def _{{ name }}(conn: sqlite3.Connection, {{ ", ".join(parameters) }}) -> {{ return_type }}:
     """{{ docstring }}"""
-    statement = """\
-{{ sql }}
-"""
-    parameters = { {%- for p in parameters %}"{{ p }}": {{ p }}{% if not loop.last %}, {% endif %}{% endfor -%} }
+    parameters = {{ parameter_tuple }}
+    {% if debug -%}
     if DEBUG_LEVEL > 0:
-        print("STATEMENT:", statement)
+        print("STATEMENT:", {{ statement }})
         print("PARAMETERS:", parameters)
-    cursor = conn.execute(statement, parameters)
+    {% endif -%}
+    {{ execute_line }}
 
     {% if return_call -%}
     return {{ return_call }}
@@ -72,15 +192,27 @@ def _{{ name }}(conn: sqlite3.Connection, {{ ", ".join(parameters) }}) -> {{ ret
 ''')
 
     for fname, qfn in statements_map.items():
-        return_info = get_return_info(qfn.operation)
+        return_info = get_return_info(qfn)
+        statement = f"_SQL_{fname.upper()}"
+        # positional binding skips sqlite3's per-parameter dict lookups
+        sql, bind_order = to_positional(strip_sql_comments(qfn.sql))
+        if len(bind_order) == 1:
+            parameter_tuple = f"({bind_order[0]},)"
+        else:
+            parameter_tuple = f"({', '.join(bind_order)})"
         out.append(
             FUNCTION_TEMPLATE.render(
                 name=fname,
+                statement=statement,
                 parameters=qfn.parameters,
-                sql=qfn.sql,
+                # comments are stripped so SQLite doesn't tokenize them on each prepare
+                sql=sql,
+                parameter_tuple=parameter_tuple,
                 docstring=f"Execute {fname} query, returns {return_info.return_type}",
+                execute_line=return_info.execute_line.format(statement=statement),
                 return_call=return_info.return_call,
                 return_type=return_info.return_type,
+                debug=debug,
             ).rstrip()
         )
         out.append("\n")
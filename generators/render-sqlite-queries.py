@@ -4,6 +4,7 @@ Renders YeSQL queries as plain SQLite query templates for use with Python's sqli
 Reads from ./sql/database-operations.autogen.yesql.sql and outputs procedural SQL statements.
 """
 
+import functools
 import importlib
 import os.path as _p
 import sys
@@ -15,35 +16,40 @@ from aiosql.queries import Queries
 from aiosql.types import QueryFn
 
 
+@functools.lru_cache(maxsize=None)
+def _load_lang_module(target_language: str):
+    # we need to import from language.<target-language>.py
+    return importlib.import_module(f"languages.{target_language}")
+
+
 def render_sqlite_queries(
-    target_language: str, statements_map: Dict[str, QueryFn], schema_sql: str = None
+    target_language: str,
+    statements_map: Dict[str, QueryFn],
+    schema_sql: str = None,
+    debug: bool = False,
 ) -> None:
-    # we need to import from language.<target-language>.py
-    module_name = f"languages.{target_language}"
-    module = importlib.import_module(module_name)
-    rendered_code = module.render(statements_map, schema_sql=schema_sql).strip()
+    module = _load_lang_module(target_language)
+    rendered_code = module.render(
+        statements_map, schema_sql=schema_sql, debug=debug
+    ).strip()
     print(rendered_code)
 
-    return
-    for k, v in statements_map.items():
-        print("===", k, "===")
-        print("OP", v.operation)
-        print("ATTRS", v.attributes)
-        print("SQL", v.sql)
-        print("PARAMS", v.parameters)
-
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3 or len(sys.argv) > 4:
+    # --debug emits tracing code into the generated target
+    debug = "--debug" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--debug"]
+
+    if len(args) < 2 or len(args) > 3:
         print(
-            f"Usage: python3 {__file__} <target-language> <yesql-file-path> [schema-sql-file-path]",
+            f"Usage: python3 {__file__} [--debug] <target-language> <yesql-file-path> [schema-sql-file-path]",
             file=sys.stderr,
         )
         sys.exit(1)
 
-    target_language = sys.argv[1]
-    yesql_file_path = sys.argv[2]
-    schema_sql_path = sys.argv[3] if len(sys.argv) == 4 else None
+    target_language = args[0]
+    yesql_file_path = args[1]
+    schema_sql_path = args[2] if len(args) == 3 else None
 
     queries: Queries = aiosql.from_path(yesql_file_path, "sqlite3")
 
@@ -59,4 +65,4 @@ if __name__ == "__main__":
         with open(schema_sql_path, "r") as f:
             schema_sql = f.read()
 
-    render_sqlite_queries(target_language, statements_map, schema_sql)
+    render_sqlite_queries(target_language, statements_map, schema_sql, debug=debug)
@@ -0,0 +1,88 @@
+"""Tests for the schema and query generators. Run with `python -m pytest`."""
+
+import copy
+import importlib.util
+import os.path as _p
+import sqlite3
+
+import aiosql
+import jsonref  # type: ignore
+import pytest
+
+
+def _load(filename):
+    # the generator scripts have dashed names, so they can't be imported directly
+    path = _p.join(_p.dirname(__file__), filename)
+    spec = importlib.util.spec_from_file_location(filename.replace("-", "_")[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+create_database = _load("create-database.py")
+create_operations_yesql = _load("create-operations-yesql.py")
+
+SCHEMA_PATH = _p.join(_p.dirname(__file__), "..", "schemas", "database.autogen.schema.json")
+
+
+def test_union_typed_column():
+    table = {
+        "type": "array",
+        "items": {
+            "properties": {
+                "note": {"type": ["string", "null"], "sqlite:type": "TEXT"},
+                "label": {"type": ["string", "null"], "sqlite:type": "TEXT"},
+            },
+            "required": ["label"],
+        },
+    }
+
+    ddl = create_database.generate_create_table_ddl("t", table)
+
+    assert "  note TEXT,\n" in ddl
+    assert "  label TEXT NOT NULL\n" in ddl
+    assert "ERROR" not in "".join(create_database.generate_table_ddl({"t": table}))
+
+
+def _build(keep_history):
+    """Render the DDL and YeSQL for the repo schema with the given history mode."""
+    with open(SCHEMA_PATH) as ifile:
+        properties = copy.deepcopy(jsonref.load(ifile, proxies=False)["properties"])
+    kv_info = create_database.find_kv_table_info(properties)
+    properties[kv_info.table_name]["sqlite:keepHistory"] = keep_history
+    kv_info = create_database.find_kv_table_info(properties)
+
+    ddl = "\n".join(create_database.generate_table_ddl(properties))
+    ddl += create_database.generate_kv_constraints(kv_info)
+    yesql = create_operations_yesql.render_yesql(
+        create_operations_yesql.find_kv_table_info(properties)
+    )
+    return ddl, yesql
+
+
+@pytest.mark.parametrize("keep_history", [True, False])
+def test_kv_variant_round_trip(keep_history):
+    ddl, yesql = _build(keep_history)
+    queries = aiosql.from_str(yesql, "sqlite3")
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.executescript(ddl)
+
+    queries.set_value(conn, key="k", value="v1")
+    queries.set_value(conn, key="k", value="v2")
+    assert queries.get_current_value(conn, key="k") == ("v2",)
+
+    queries.delete_key(conn, key="k")
+    assert queries.get_current_value(conn, key="k") is None
+    assert list(queries.list_active_keys(conn)) == []
+
+    queries.set_value(conn, key="k", value="v3")
+    assert queries.get_current_value(conn, key="k") == ("v3",)
+    assert list(queries.list_active_keys(conn)) == [("k",)]
+
+    (rows,) = conn.execute("SELECT count(*) FROM kv WHERE key = 'k'").fetchone()
+    assert rows == (3 if keep_history else 1)
+
+    # re-running the schema script on a populated database is a no-op
+    conn.executescript(ddl)
+    assert queries.get_current_value(conn, key="k") == ("v3",)
+
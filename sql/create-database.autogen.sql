@@ -27,12 +27,20 @@ CREATE TABLE IF NOT EXISTS kv (
 
 /*
  * Initialization Data: Schema Version and Creation Date (Idempotent)
- * These records are only inserted if they do not already exist.
+ * Version records are refreshed; the creation date is only inserted once.
  */
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0');
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123');
+INSERT INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0+d8aae042ed8e') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+INSERT INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
 INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
 
+-- Convenience view
+CREATE VIEW IF NOT EXISTS kv_current AS
+  SELECT key, value, inserted_at
+  FROM kv
+  WHERE is_active = 1;
+
+-- squeakyv:post-load
+
 -- Only one active row per key
 CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;
 
@@ -48,9 +56,3 @@ BEGIN
   WHERE key = NEW.key AND is_active = 1;
 END;
 
--- Convenience view
-CREATE VIEW IF NOT EXISTS kv_current AS
-  SELECT key, value, inserted_at
-  FROM kv
-  WHERE is_active = 1;
-
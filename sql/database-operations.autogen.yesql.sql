@@ -11,6 +11,13 @@ SELECT value -- , inserted_at
 FROM kv
 WHERE key = :key AND is_active = 1;
 
+-- name: get-many-values(keys)
+-- Retrieves the active (key, value) pairs for a JSON array of keys
+-- squeakyv:key-value-rows
+SELECT key, value
+FROM kv
+WHERE is_active = 1 AND key IN (SELECT value FROM json_each(:keys));
+
 -- name: set-value(key, value)!
 -- Sets a new value for a key (trigger handles deactivating old values)
 INSERT INTO kv (key, value)
@@ -28,3 +35,12 @@ SELECT key -- , inserted_at
 FROM kv
 WHERE is_active = 1
 ORDER BY inserted_at DESC;
+
+-- name: list-active-keys-with-prefix(prefix)
+-- Lists currently active keys starting with prefix
+-- (a key range rather than a string function, so the key index applies)
+SELECT key -- , inserted_at
+FROM kv
+WHERE is_active = 1
+  AND key >= :prefix AND key < :prefix || char(1114111)
+ORDER BY inserted_at DESC;
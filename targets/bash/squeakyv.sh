@@ -39,12 +39,20 @@ CREATE TABLE IF NOT EXISTS kv (
 
 /*
  * Initialization Data: Schema Version and Creation Date (Idempotent)
- * These records are only inserted if they do not already exist.
+ * Version records are refreshed; the creation date is only inserted once.
  */
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0');
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123');
+INSERT INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0+d8aae042ed8e') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+INSERT INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
 INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
 
+-- Convenience view
+CREATE VIEW IF NOT EXISTS kv_current AS
+  SELECT key, value, inserted_at
+  FROM kv
+  WHERE is_active = 1;
+
+-- squeakyv:post-load
+
 -- Only one active row per key
 CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;
 
@@ -60,12 +68,6 @@ BEGIN
   WHERE key = NEW.key AND is_active = 1;
 END;
 
--- Convenience view
-CREATE VIEW IF NOT EXISTS kv_current AS
-  SELECT key, value, inserted_at
-  FROM kv
-  WHERE is_active = 1;
-
 
 SQUEAKYV_SCHEMA_EOF
 )
@@ -190,6 +192,25 @@ SQUEAKYV_SQL_EOF
 }
 
 
+# Execute get_many_values operation
+squeakyv_get_many_values() {
+    local db_path="$1"
+    local keys="$2"
+
+    local sql=$(cat <<'SQUEAKYV_SQL_EOF'
+WITH pairs(key, value) AS (
+SELECT key, value
+FROM kv
+WHERE is_active = 1 AND key IN (SELECT value FROM json_each(:keys))
+)
+SELECT json_group_object(key, hex(value)) FROM pairs;
+SQUEAKYV_SQL_EOF
+)
+
+    _squeakyv_query_one "$db_path" "$sql" "keys" "$keys"
+}
+
+
 # Execute list_active_keys operation
 squeakyv_list_active_keys() {
     local db_path="$1"
@@ -206,6 +227,24 @@ SQUEAKYV_SQL_EOF
 }
 
 
+# Execute list_active_keys_with_prefix operation
+squeakyv_list_active_keys_with_prefix() {
+    local db_path="$1"
+    local prefix="$2"
+
+    local sql=$(cat <<'SQUEAKYV_SQL_EOF'
+SELECT key -- , inserted_at
+FROM kv
+WHERE is_active = 1
+  AND key >= :prefix AND key < :prefix || char(1114111)
+ORDER BY inserted_at DESC;
+SQUEAKYV_SQL_EOF
+)
+
+    _squeakyv_query_all "$db_path" "$sql" "prefix" "$prefix"
+}
+
+
 # Execute set_value operation
 squeakyv_set_value() {
     local db_path="$1"
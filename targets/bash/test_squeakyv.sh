@@ -78,6 +78,29 @@ else
     exit 1
 fi
 
+echo ""
+echo "--- Test 8: List keys with prefix ---"
+squeakyv_set_value "$DB" "user:1" "alice"
+squeakyv_set_value "$DB" "users" "not-a-match"
+keys=$(squeakyv_list_active_keys_with_prefix "$DB" "user:")
+if [[ "$keys" == "user:1" ]]; then
+    echo "✓ Prefix match: $keys"
+else
+    echo "✗ Expected only 'user:1', got '$keys'"
+    exit 1
+fi
+
+echo ""
+echo "--- Test 9: Get many values ---"
+result=$(squeakyv_get_many_values "$DB" '["key2","user:1","missing"]')
+# values are hex-encoded: value2 = 76616C756532, alice = 616C696365
+if [[ "$result" == '{"key2":"76616C756532","user:1":"616C696365"}' || "$result" == '{"user:1":"616C696365","key2":"76616C756532"}' ]]; then
+    echo "✓ Get many: $result"
+else
+    echo "✗ Unexpected get-many result '$result'"
+    exit 1
+fi
+
 echo ""
 echo "=================================================="
 echo "✅ All tests passed!"
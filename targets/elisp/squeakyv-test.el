@@ -147,6 +147,40 @@
 
     (sqlite-close db)))
 
+(ert-deftest squeakyv-test-list-keys-with-prefix ()
+  "Test listing active keys that start with a prefix."
+  (let ((db (sqlite-open)))
+    (squeakyv-init-db db)
+
+    (squeakyv-set-value db "user:1" "alice")
+    (squeakyv-set-value db "user:2" "bob")
+    (squeakyv-set-value db "users" "not a match")
+    (squeakyv-set-value db "世界:1" "unicode")
+    (squeakyv-delete-key db "user:2")
+
+    (should (equal (squeakyv-list-active-keys-with-prefix db "user:")
+                   '("user:1")))
+    (should (equal (squeakyv-list-active-keys-with-prefix db "世界")
+                   '("世界:1")))
+
+    (sqlite-close db)))
+
+(ert-deftest squeakyv-test-get-many-values ()
+  "Test fetching several keys as a JSON object of hex-encoded values."
+  (let ((db (sqlite-open)))
+    (squeakyv-init-db db)
+
+    (squeakyv-set-value db "a" "alpha")
+    (squeakyv-set-value db "b" "beta")
+
+    (let ((values (json-parse-string
+                   (squeakyv-get-many-values db "[\"a\", \"b\", \"missing\"]"))))
+      (should (= (hash-table-count values) 2))
+      (should (equal (gethash "a" values) "616C706861"))
+      (should (equal (gethash "b" values) "62657461")))
+
+    (sqlite-close db)))
+
 (ert-deftest squeakyv-test-unicode ()
   "Test storing unicode strings."
   (let ((db (sqlite-open)))
@@ -38,26 +38,26 @@ DB should be a SQLite database handle from `sqlite-open'."
 
   (sqlite-execute db "CREATE TABLE IF NOT EXISTS kv ( inserted_at INTEGER NOT NULL DEFAULT (CAST(unixepoch('subsec') * 1000 AS INTEGER)), is_active INTEGER NOT NULL DEFAULT (1) CHECK (is_active IN (0,1)), key TEXT NOT NULL, value BLOB NOT NULL );")
 
-  (sqlite-execute db "INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0');")
+  (sqlite-execute db "INSERT INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0+d8aae042ed8e') ON CONFLICT(key) DO UPDATE SET value = excluded.value;")
 
-  (sqlite-execute db "INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123');")
+  (sqlite-execute db "INSERT INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123') ON CONFLICT(key) DO UPDATE SET value = excluded.value;")
 
   (sqlite-execute db "INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));")
 
+  (sqlite-execute db "CREATE VIEW IF NOT EXISTS kv_current AS SELECT key, value, inserted_at FROM kv WHERE is_active = 1;")
+
   (sqlite-execute db "CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;")
 
   (sqlite-execute db "CREATE INDEX IF NOT EXISTS kv_key_time ON kv(key, inserted_at);")
 
   (sqlite-execute db "CREATE TRIGGER IF NOT EXISTS kv_swap_active BEFORE INSERT ON kv FOR EACH ROW BEGIN UPDATE kv SET is_active = 0 WHERE key = NEW.key AND is_active = 1; END;")
 
-  (sqlite-execute db "CREATE VIEW IF NOT EXISTS kv_current AS SELECT key, value, inserted_at FROM kv WHERE is_active = 1;")
-
   nil)
 
 
 (defun squeakyv-delete-key (db key)
   "Execute delete_key operation."
-  (let ((sql "UPDATE kv\nSET is_active = 0\nWHERE key = ? AND is_active = 1;")
+  (let ((sql "UPDATE kv\nSET is_active = 0\nWHERE key = ?1 AND is_active = 1;")
         (params (list key)))
     (sqlite-execute db sql params)
     nil))
@@ -65,7 +65,7 @@ DB should be a SQLite database handle from `sqlite-open'."
 
 (defun squeakyv-get-current-value (db key)
   "Execute get_current_value operation."
-  (let ((sql "SELECT value -- , inserted_at\nFROM kv\nWHERE key = ? AND is_active = 1;")
+  (let ((sql "SELECT value -- , inserted_at\nFROM kv\nWHERE key = ?1 AND is_active = 1;")
         (params (list key)))
     ;; Return first value from first row, or nil
     (let ((result (sqlite-select db sql params)))
@@ -74,6 +74,17 @@ DB should be a SQLite database handle from `sqlite-open'."
         nil))))
 
 
+(defun squeakyv-get-many-values (db keys)
+  "Execute get_many_values operation."
+  (let ((sql "WITH pairs(key, value) AS (\nSELECT key, value\nFROM kv\nWHERE is_active = 1 AND key IN (SELECT value FROM json_each(?1))\n)\nSELECT json_group_object(key, hex(value)) FROM pairs;")
+        (params (list keys)))
+    ;; Return first value from first row, or nil
+    (let ((result (sqlite-select db sql params)))
+      (if result
+          (car (car result))
+        nil))))
+
+
 (defun squeakyv-list-active-keys (db)
   "Execute list_active_keys operation."
   (let ((sql "SELECT key -- , inserted_at\nFROM kv\nWHERE is_active = 1\nORDER BY inserted_at DESC;")
@@ -82,9 +93,17 @@ DB should be a SQLite database handle from `sqlite-open'."
     (mapcar #'car (sqlite-select db sql params))))
 
 
+(defun squeakyv-list-active-keys-with-prefix (db prefix)
+  "Execute list_active_keys_with_prefix operation."
+  (let ((sql "SELECT key -- , inserted_at\nFROM kv\nWHERE is_active = 1\n  AND key >= ?1 AND key < ?1 || char(1114111)\nORDER BY inserted_at DESC;")
+        (params (list prefix)))
+    ;; Return list of values (first column from each row)
+    (mapcar #'car (sqlite-select db sql params))))
+
+
 (defun squeakyv-set-value (db key value)
   "Execute set_value operation."
-  (let ((sql "INSERT INTO kv (key, value)\nVALUES (?, ?);")
+  (let ((sql "INSERT INTO kv (key, value)\nVALUES (?1, ?2);")
         (params (list key value)))
     (sqlite-execute db sql params)
     nil))
@@ -39,12 +39,20 @@ CREATE TABLE IF NOT EXISTS kv (
 
 /*
  * Initialization Data: Schema Version and Creation Date (Idempotent)
- * These records are only inserted if they do not already exist.
+ * Version records are refreshed; the creation date is only inserted once.
  */
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0');
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123');
+INSERT INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0+d8aae042ed8e') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+INSERT INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
 INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
 
+-- Convenience view
+CREATE VIEW IF NOT EXISTS kv_current AS
+  SELECT key, value, inserted_at
+  FROM kv
+  WHERE is_active = 1;
+
+-- squeakyv:post-load
+
 -- Only one active row per key
 CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;
 
@@ -60,12 +68,6 @@ BEGIN
   WHERE key = NEW.key AND is_active = 1;
 END;
 
--- Convenience view
-CREATE VIEW IF NOT EXISTS kv_current AS
-  SELECT key, value, inserted_at
-  FROM kv
-  WHERE is_active = 1;
-
 `
 
 
@@ -73,7 +75,7 @@ CREATE VIEW IF NOT EXISTS kv_current AS
 func _deleteKey(db *sql.DB, key string) error {
 	query := `UPDATE kv
 SET is_active = 0
-WHERE key = ? AND is_active = 1;`
+WHERE key = ?1 AND is_active = 1;`
 	args := []interface{}{key}
 
 	_, err := db.Exec(query, args...)
@@ -88,7 +90,7 @@ WHERE key = ? AND is_active = 1;`
 func _getCurrentValue(db *sql.DB, key string) ([]byte, error) {
 	query := `SELECT value -- , inserted_at
 FROM kv
-WHERE key = ? AND is_active = 1;`
+WHERE key = ?1 AND is_active = 1;`
 	args := []interface{}{key}
 
 	var value []byte
@@ -103,6 +105,28 @@ WHERE key = ? AND is_active = 1;`
 }
 
 
+// _getManyValues executes the get_many_values query
+func _getManyValues(db *sql.DB, keys string) ([]byte, error) {
+	query := `WITH pairs(key, value) AS (
+SELECT key, value
+FROM kv
+WHERE is_active = 1 AND key IN (SELECT value FROM json_each(?1))
+)
+SELECT json_group_object(key, hex(value)) FROM pairs;`
+	args := []interface{}{keys}
+
+	var value []byte
+	err := db.QueryRow(query, args...).Scan(&value)
+	if err == sql.ErrNoRows {
+		return nil, nil
+	}
+	if err != nil {
+		return nil, fmt.Errorf("query failed: %w", err)
+	}
+	return value, nil
+}
+
+
 // _listActiveKeys executes the list_active_keys query
 func _listActiveKeys(db *sql.DB) ([]string, error) {
 	query := `SELECT key -- , inserted_at
@@ -134,10 +158,42 @@ ORDER BY inserted_at DESC;`
 }
 
 
+// _listActiveKeysWithPrefix executes the list_active_keys_with_prefix query
+func _listActiveKeysWithPrefix(db *sql.DB, prefix string) ([]string, error) {
+	query := `SELECT key -- , inserted_at
+FROM kv
+WHERE is_active = 1
+  AND key >= ?1 AND key < ?1 || char(1114111)
+ORDER BY inserted_at DESC;`
+	args := []interface{}{prefix}
+
+	rows, err := db.Query(query, args...)
+	if err != nil {
+		return nil, fmt.Errorf("query failed: %w", err)
+	}
+	defer rows.Close()
+
+	var results []string
+	for rows.Next() {
+		var value string
+		if err := rows.Scan(&value); err != nil {
+			return nil, fmt.Errorf("scan failed: %w", err)
+		}
+		results = append(results, value)
+	}
+
+	if err = rows.Err(); err != nil {
+		return nil, fmt.Errorf("rows iteration failed: %w", err)
+	}
+
+	return results, nil
+}
+
+
 // _setValue executes the set_value query
 func _setValue(db *sql.DB, key string, value []byte) error {
 	query := `INSERT INTO kv (key, value)
-VALUES (?, ?);`
+VALUES (?1, ?2);`
 	args := []interface{}{key, value}
 
 	_, err := db.Exec(query, args...)
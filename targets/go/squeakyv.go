@@ -23,6 +23,8 @@ package squeakyv
 
 import (
 	"database/sql"
+	"encoding/hex"
+	"encoding/json"
 	"fmt"
 	"sync"
 
@@ -91,6 +93,44 @@ func (c *CacheClient) Get(key string) ([]byte, error) {
 	return _getCurrentValue(c.db, key)
 }
 
+// GetMany retrieves the values for several keys with a single query.
+//
+// Keys that don't exist are omitted from the returned map.
+//
+// Example:
+//
+//	values, err := client.GetMany([]string{"a", "b"})
+//	if err != nil {
+//		return err
+//	}
+//	fmt.Println(string(values["a"]))
+func (c *CacheClient) GetMany(keys []string) (map[string][]byte, error) {
+	keysJSON, err := json.Marshal(keys)
+	if err != nil {
+		return nil, fmt.Errorf("failed to encode keys: %w", err)
+	}
+
+	encoded, err := _getManyValues(c.db, string(keysJSON))
+	if err != nil {
+		return nil, err
+	}
+
+	var hexValues map[string]string
+	if err := json.Unmarshal(encoded, &hexValues); err != nil {
+		return nil, fmt.Errorf("failed to decode values: %w", err)
+	}
+
+	values := make(map[string][]byte, len(hexValues))
+	for key, hexValue := range hexValues {
+		value, err := hex.DecodeString(hexValue)
+		if err != nil {
+			return nil, fmt.Errorf("failed to decode value for %q: %w", key, err)
+		}
+		values[key] = value
+	}
+	return values, nil
+}
+
 // Set stores a value for a key.
 //
 // If the key already exists, a new version is created and the old value is
@@ -130,6 +170,16 @@ func (c *CacheClient) ListKeys() ([]string, error) {
 	return _listActiveKeys(c.db)
 }
 
+// ListKeysWithPrefix returns the active keys starting with prefix, ordered by
+// insertion time (newest first).
+//
+// Example:
+//
+//	keys, err := client.ListKeysWithPrefix("user:")
+func (c *CacheClient) ListKeysWithPrefix(prefix string) ([]string, error) {
+	return _listActiveKeysWithPrefix(c.db, prefix)
+}
+
 // Close closes the database connection.
 //
 // After calling Close, the client should not be used.
@@ -206,6 +206,66 @@ func TestListKeysAfterDelete(t *testing.T) {
 	}
 }
 
+func TestListKeysWithPrefix(t *testing.T) {
+	client, err := NewCacheClient(":memory:")
+	if err != nil {
+		t.Fatalf("Failed to create client: %v", err)
+	}
+	defer client.Close()
+
+	for _, key := range []string{"user:1", "user:2", "users", "session:1"} {
+		if err := client.Set(key, []byte("value")); err != nil {
+			t.Fatalf("Failed to set %s: %v", key, err)
+		}
+	}
+	if err := client.Delete("user:2"); err != nil {
+		t.Fatalf("Failed to delete: %v", err)
+	}
+
+	keys, err := client.ListKeysWithPrefix("user:")
+	if err != nil {
+		t.Fatalf("Failed to list keys with prefix: %v", err)
+	}
+
+	if len(keys) != 1 || keys[0] != "user:1" {
+		t.Errorf("Expected [user:1], got %v", keys)
+	}
+}
+
+func TestGetMany(t *testing.T) {
+	client, err := NewCacheClient(":memory:")
+	if err != nil {
+		t.Fatalf("Failed to create client: %v", err)
+	}
+	defer client.Close()
+
+	binary := []byte{0x00, 0x01, 0xFF}
+	if err := client.Set("a", []byte("alpha")); err != nil {
+		t.Fatalf("Failed to set a: %v", err)
+	}
+	if err := client.Set("b", binary); err != nil {
+		t.Fatalf("Failed to set b: %v", err)
+	}
+
+	values, err := client.GetMany([]string{"a", "b", "missing"})
+	if err != nil {
+		t.Fatalf("Failed to get many: %v", err)
+	}
+
+	if len(values) != 2 {
+		t.Errorf("Expected 2 values, got %d", len(values))
+	}
+	if !bytes.Equal(values["a"], []byte("alpha")) {
+		t.Errorf("Expected alpha, got %s", values["a"])
+	}
+	if !bytes.Equal(values["b"], binary) {
+		t.Errorf("Binary data mismatch")
+	}
+	if _, ok := values["missing"]; ok {
+		t.Errorf("Missing key should be omitted")
+	}
+}
+
 func TestPersistence(t *testing.T) {
 	// Create temp file
 	tmpDir := t.TempDir()
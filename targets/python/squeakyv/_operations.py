@@ -4,8 +4,7 @@ DO NOT EDIT THIS FILE MANUALLY - it is generated by the build pipeline.
 Source: generators/languages/python.py
 """
 import sqlite3
-
-DEBUG_LEVEL = 0
+from itertools import chain
 
 
 # Embedded database schema
@@ -39,12 +38,20 @@ CREATE TABLE IF NOT EXISTS kv (
 
 /*
  * Initialization Data: Schema Version and Creation Date (Idempotent)
- * These records are only inserted if they do not already exist.
+ * Version records are refreshed; the creation date is only inserted once.
  */
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0');
-INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123');
+INSERT INTO __metadata__ (key, value) VALUES ('schema_version', '1.0.0+d8aae042ed8e') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+INSERT INTO __metadata__ (key, value) VALUES ('schema_tree_ish', 'git-hash-abc123') ON CONFLICT(key) DO UPDATE SET value = excluded.value;
 INSERT OR IGNORE INTO __metadata__ (key, value) VALUES ('creation_date', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
 
+-- Convenience view
+CREATE VIEW IF NOT EXISTS kv_current AS
+  SELECT key, value, inserted_at
+  FROM kv
+  WHERE is_active = 1;
+
+-- squeakyv:post-load
+
 -- Only one active row per key
 CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;
 
@@ -60,71 +67,111 @@ BEGIN
   WHERE key = NEW.key AND is_active = 1;
 END;
 
--- Convenience view
-CREATE VIEW IF NOT EXISTS kv_current AS
-  SELECT key, value, inserted_at
-  FROM kv
-  WHERE is_active = 1;
-
 
 """
 
 
+# Schema version that SCHEMA_SQL records in __metadata__
+SCHEMA_VERSION = "1.0.0+d8aae042ed8e"
+
+
+# Post-load schema section, rebuilt after bulk loads
+SCHEMA_POST_LOAD_STATEMENTS = (
+    """\
+CREATE UNIQUE INDEX IF NOT EXISTS kv_active_key ON kv(key) WHERE is_active = 1;""",
+    """\
+CREATE INDEX IF NOT EXISTS kv_key_time ON kv(key, inserted_at);""",
+    """\
+CREATE TRIGGER IF NOT EXISTS kv_swap_active
+BEFORE INSERT ON kv
+FOR EACH ROW
+BEGIN
+  UPDATE kv SET is_active = 0
+  WHERE key = NEW.key AND is_active = 1;
+END;""",
+)
+SCHEMA_POST_LOAD_DROPS = (
+    "DROP INDEX IF EXISTS kv_active_key",
+    "DROP INDEX IF EXISTS kv_key_time",
+    "DROP TRIGGER IF EXISTS kv_swap_active",
+)
+
+
+_SQL_DELETE_KEY = """UPDATE kv
+SET is_active = 0
+WHERE key = ? AND is_active = 1;"""
+
+
 def _delete_key(conn: sqlite3.Connection, key) -> None:
     """Execute delete_key query, returns None"""
-    statement = """UPDATE kv
-SET is_active = 0
-WHERE key = :key AND is_active = 1;
-"""
-    parameters = {"key": key}
-    if DEBUG_LEVEL > 0:
-        print("STATEMENT:", statement)
-        print("PARAMETERS:", parameters)
-    cursor = conn.execute(statement, parameters)
+    parameters = (key,)
+    conn.execute(_SQL_DELETE_KEY, parameters)
 
     return None
 
 
+_SQL_GET_CURRENT_VALUE = """SELECT value
+FROM kv
+WHERE key = ? AND is_active = 1;"""
+
+
 def _get_current_value(conn: sqlite3.Connection, key) -> str | bytes | None:
     """Execute get_current_value query, returns str | bytes | None"""
-    statement = """SELECT value -- , inserted_at
+    parameters = (key,)
+    row = conn.execute(_SQL_GET_CURRENT_VALUE, parameters).fetchone()
+
+    return row[0] if row is not None else None
+
+
+_SQL_GET_MANY_VALUES = """SELECT key, value
 FROM kv
-WHERE key = :key AND is_active = 1;
-"""
-    parameters = {"key": key}
-    if DEBUG_LEVEL > 0:
-        print("STATEMENT:", statement)
-        print("PARAMETERS:", parameters)
-    cursor = conn.execute(statement, parameters)
+WHERE is_active = 1 AND key IN (SELECT value FROM json_each(?));"""
 
-    return (row[0] if (row := cursor.fetchone()) is not None else None)
+
+def _get_many_values(conn: sqlite3.Connection, keys) -> dict[str, str | bytes]:
+    """Execute get_many_values query, returns dict[str, str | bytes]"""
+    parameters = (keys,)
+    rows = conn.execute(_SQL_GET_MANY_VALUES, parameters)
+
+    return dict(rows)
+
+
+_SQL_LIST_ACTIVE_KEYS = """SELECT key
+FROM kv
+WHERE is_active = 1
+ORDER BY inserted_at DESC;"""
 
 
 def _list_active_keys(conn: sqlite3.Connection, ) -> list[str]:
     """Execute list_active_keys query, returns list[str]"""
-    statement = """SELECT key -- , inserted_at
+    parameters = ()
+    rows = conn.execute(_SQL_LIST_ACTIVE_KEYS, parameters)
+
+    return list(chain.from_iterable(rows))
+
+
+_SQL_LIST_ACTIVE_KEYS_WITH_PREFIX = """SELECT key
 FROM kv
 WHERE is_active = 1
-ORDER BY inserted_at DESC;
-"""
-    parameters = {}
-    if DEBUG_LEVEL > 0:
-        print("STATEMENT:", statement)
-        print("PARAMETERS:", parameters)
-    cursor = conn.execute(statement, parameters)
+  AND key >= ? AND key < ? || char(1114111)
+ORDER BY inserted_at DESC;"""
+
+
+def _list_active_keys_with_prefix(conn: sqlite3.Connection, prefix) -> list[str]:
+    """Execute list_active_keys_with_prefix query, returns list[str]"""
+    parameters = (prefix, prefix)
+    rows = conn.execute(_SQL_LIST_ACTIVE_KEYS_WITH_PREFIX, parameters)
 
-    return [row[0] for row in cursor.fetchall()]
+    return list(chain.from_iterable(rows))
+
+
+_SQL_SET_VALUE = """INSERT INTO kv (key, value)
+VALUES (?, ?);"""
 
 
 def _set_value(conn: sqlite3.Connection, key, value) -> None:
     """Execute set_value query, returns None"""
-    statement = """INSERT INTO kv (key, value)
-VALUES (:key, :value);
-"""
-    parameters = {"key": key, "value": value}
-    if DEBUG_LEVEL > 0:
-        print("STATEMENT:", statement)
-        print("PARAMETERS:", parameters)
-    cursor = conn.execute(statement, parameters)
+    parameters = (key, value)
+    conn.execute(_SQL_SET_VALUE, parameters)
 
     return None
@@ -5,13 +5,32 @@ Provides thread-safe SQLite-backed key-value caching.
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import json
 import os
+import queue
 import sqlite3
 import threading
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
 from . import _operations
 
+# Per-connection tuning, applied once when a connection is opened.
+# WAL + synchronous=NORMAL avoids an fsync per autocommit write; the rest
+# keep temp structures and hot pages in memory.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Seconds to wait on a locked database, or on the shared in-memory connection
+_BUSY_TIMEOUT = 30.0
+
 
 class KeyNotFoundError(Exception):
     """Raised when attempting to access a non-existent key."""
@@ -22,7 +41,7 @@ class CacheClient:
     """
     Thread-safe SQLite-backed key-value cache client.
 
-    Uses thread-local connections for safe concurrent access.
+    Operations borrow a connection from a small pool and return it when done.
     Supports context manager protocol for automatic cleanup.
 
     Example:
@@ -35,45 +54,138 @@ class CacheClient:
         None
     """
 
-    def __init__(self, path: str = ":memory:"):
+    def __init__(
+        self, path: str = ":memory:", read_cache_size: int = 0, pool_size: int = 8
+    ):
         """
         Initialize a new cache client.
 
         Args:
             path: Database file path. Defaults to ":memory:" for in-memory cache.
                   Use an explicit path for persistent caching.
+            read_cache_size: Number of recently read values to keep in an
+                  in-process LRU in front of SQLite. 0 (default) disables it.
+                  Only enable it when this client is the sole writer: writes
+                  made by other clients or processes are not seen until the
+                  entry is evicted.
+            pool_size: Maximum number of idle connections kept for reuse;
+                  must be at least 1. An in-memory cache always uses exactly
+                  one shared connection, since each connection to ":memory:"
+                  would otherwise be a separate database. While one thread
+                  holds it in transaction(), other threads wait for it, and
+                  raise sqlite3.OperationalError after 30 seconds.
+
+        Raises:
+            ValueError: If pool_size is less than 1
         """
+        if pool_size < 1:
+            raise ValueError(f"pool_size must be at least 1, got {pool_size}")
         self.path = path
+        self._in_memory = path == ":memory:"
+        # LIFO so the most recently returned connection, with the warmest
+        # page cache, is reused first
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(
+            maxsize=1 if self._in_memory else pool_size
+        )
+        self._closed = False
+        # Connection pinned to the current thread by an open transaction()
         self._local = threading.local()
+        self._read_cache: OrderedDict[str, bytes] = OrderedDict()
+        self._read_cache_size = read_cache_size
+        self._read_cache_lock = threading.Lock()
+        # Bumped on every invalidation so a read racing a write cannot
+        # repopulate the cache with the value it just replaced
+        self._read_cache_generation = 0
+        if self._in_memory:
+            self._pool.put(self._connect())
         self._init_db()
 
-    def _get_conn(self) -> sqlite3.Connection:
+    def _connect(self) -> sqlite3.Connection:
         """
-        Get or create a thread-local database connection.
+        Open a new database connection.
+
+        New connections are tuned with _CONNECTION_PRAGMAS. Prepared
+        statements are reused through sqlite3's per-connection statement
+        cache, which is keyed by SQL text, so each generated query is only
+        parsed once per connection.
 
         Returns:
-            sqlite3.Connection: Thread-local connection instance
+            sqlite3.Connection: New connection instance
         """
-        conn = getattr(self._local, "conn", None)
-        if conn is None:
-            conn = sqlite3.connect(
-                self.path,
-                timeout=30.0,
-                isolation_level=None,  # autocommit mode
-                check_same_thread=False,
-            )
-            self._local.conn = conn
+        conn = sqlite3.connect(
+            self.path,
+            timeout=_BUSY_TIMEOUT,
+            isolation_level=None,  # autocommit mode
+            # no adapter/converter dispatch on columns; rows stay plain tuples
+            detect_types=0,
+            # pooled connections are handed from thread to thread
+            check_same_thread=False,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
 
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle connection from the pool, or open a new one."""
+        if self._in_memory:
+            if self._closed:
+                raise sqlite3.ProgrammingError(
+                    "Cannot operate on a closed in-memory CacheClient."
+                )
+            # Wait for the single shared connection; bounded, so a transaction
+            # that waits on another thread using this client fails instead
+            # of deadlocking
+            try:
+                return self._pool.get(timeout=_BUSY_TIMEOUT)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    "Timed out waiting for the in-memory connection; "
+                    "it is held by a transaction() in another thread."
+                ) from None
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        if self._closed and self._in_memory:
+            # close() has discarded the in-memory database
+            conn.close()
+            return
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of the block.
+
+        Inside transaction() this is the connection pinned to the current
+        thread; otherwise it comes from, and goes back to, the pool.
+        """
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
     def _init_db(self) -> None:
         """
         Initialize database schema from embedded SQL.
 
         Uses the schema SQL string embedded in the _operations module
         and executes it to create tables, indexes, triggers, and views.
+        Skipped when the database already records the embedded
+        SCHEMA_VERSION, so reopening a warm database costs one SELECT.
         """
-        conn = self._get_conn()
-
         # Import embedded schema SQL from generated module
         if not hasattr(_operations, 'SCHEMA_SQL'):
             raise RuntimeError(
@@ -82,7 +194,33 @@ class CacheClient:
                 "Run the build pipeline to regenerate: sdflow generate-python-target"
             )
 
-        conn.executescript(_operations.SCHEMA_SQL)
+        with self._borrow() as conn:
+            if self._schema_is_current(conn):
+                return
+
+            # One transaction, so schema_version only becomes visible once
+            # every statement in the script has been applied
+            try:
+                conn.executescript(f"BEGIN IMMEDIATE;\n{_operations.SCHEMA_SQL}\nCOMMIT;")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _schema_is_current(conn: sqlite3.Connection) -> bool:
+        """Check whether the database already holds the embedded schema version."""
+        expected = getattr(_operations, "SCHEMA_VERSION", None)
+        if expected is None:
+            return False
+        try:
+            row = conn.execute(
+                "SELECT value FROM __metadata__ WHERE key = 'schema_version'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Fresh database: no __metadata__ table yet
+            return False
+        return row is not None and row[0] == expected
 
     def get(self, key: str, default: Any = None) -> bytes | None:
         """
@@ -95,14 +233,76 @@ class CacheClient:
         Returns:
             The stored bytes value, or default if key not found
         """
-        conn = self._get_conn()
-        result = _operations._get_current_value(conn, key)
+        # Inside a transaction the LRU is bypassed both ways: it may hold a
+        # value committed by another thread after this transaction's write
+        pinned = getattr(self._local, "conn", None)
+        if self._read_cache_size and pinned is None:
+            with self._read_cache_lock:
+                cached = self._read_cache.get(key)
+                if cached is not None:
+                    self._read_cache.move_to_end(key)
+                    return cached
+                generation = self._read_cache_generation
+
+        # Hot path (memoize hits land here): same as _borrow(), inlined to
+        # skip the generator-based context manager
+        conn = pinned if pinned is not None else self._checkout()
+        try:
+            result = _operations._get_current_value(conn, key)
+        finally:
+            if pinned is None:
+                self._checkin(conn)
 
         if result is None:
             return default
 
+        if self._read_cache_size and pinned is None:
+            self._cache_put(key, result, generation)
+
         return result
 
+    def get_many(self, keys: Sequence[str]) -> dict[str, bytes]:
+        """
+        Retrieve values for several keys with a single query.
+
+        Args:
+            keys: The keys to retrieve
+
+        Returns:
+            Dict mapping each found key to its value; missing keys are omitted
+        """
+        found: dict[str, bytes] = {}
+        missing = list(keys)
+        # As in get(), a transaction reads around the LRU
+        pinned = getattr(self._local, "conn", None)
+        use_cache = self._read_cache_size and pinned is None
+
+        if use_cache:
+            with self._read_cache_lock:
+                pending = []
+                for key in missing:
+                    cached = self._read_cache.get(key)
+                    if cached is None:
+                        pending.append(key)
+                    else:
+                        self._read_cache.move_to_end(key)
+                        found[key] = cached
+                generation = self._read_cache_generation
+            missing = pending
+
+        if not missing:
+            return found
+
+        with self._borrow() as conn:
+            rows = _operations._get_many_values(conn, json.dumps(missing))
+
+        found.update(rows)
+        if use_cache:
+            for key, value in rows.items():
+                self._cache_put(key, value, generation)
+
+        return found
+
     def set(self, key: str, value: bytes) -> None:
         """
         Store a value for a key.
@@ -117,14 +317,120 @@ class CacheClient:
         Raises:
             TypeError: If value is not bytes
         """
-        if not isinstance(value, bytes):
-            raise TypeError(
-                f"Value must be bytes, got {type(value).__name__}. "
-                "Use value.encode() for strings or pickle.dumps() for objects."
-            )
+        _check_value(value)
+
+        with self._borrow() as conn:
+            _operations._set_value(conn, key, value)
+        self._cache_invalidate(key)
+
+    def set_many(self, items: Iterable[tuple[str, bytes]]) -> None:
+        """
+        Store several key/value pairs in a single transaction.
+
+        Equivalent to calling set() for each pair, but commits once at
+        the end instead of once per write.
 
-        conn = self._get_conn()
-        _operations._set_value(conn, key, value)
+        Args:
+            items: Iterable of (key, value) pairs
+
+        Raises:
+            TypeError: If any value is not bytes (nothing is stored)
+        """
+        with self.transaction(), self._borrow() as conn:
+            for key, value in items:
+                _check_value(value)
+                _operations._set_value(conn, key, value)
+                self._cache_invalidate(key)
+
+    def bulk_load(self, items: Iterable[tuple[str, bytes]]) -> None:
+        """
+        Load many key/value pairs, rebuilding indexes once at the end.
+
+        Inside a single transaction, drops the schema's post-load indexes
+        and triggers, inserts every pair, then recreates them. Best suited
+        to filling an empty or small cache; on a large table, rebuilding
+        the indexes can cost more than updating them per row.
+
+        If a key appears more than once in items, only the last value is
+        stored (no intermediate versions are kept).
+
+        Args:
+            items: Iterable of (key, value) pairs
+
+        Raises:
+            TypeError: If any value is not bytes (nothing is stored)
+        """
+        latest: dict[str, bytes] = {}
+        for key, value in items:
+            _check_value(value)
+            latest[key] = value
+        if not latest:
+            # Nothing to load; don't drop and rebuild the indexes for it
+            return
+
+        with self.transaction(), self._borrow() as conn:
+            # Retire current versions while the active-key index still exists;
+            # the swap-out trigger is about to be dropped
+            for key in latest:
+                _operations._delete_key(conn, key)
+            for statement in _operations.SCHEMA_POST_LOAD_DROPS:
+                conn.execute(statement)
+            for key, value in latest.items():
+                _operations._set_value(conn, key, value)
+            for statement in _operations.SCHEMA_POST_LOAD_STATEMENTS:
+                conn.execute(statement)
+        self._cache_invalidate()
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[CacheClient]:
+        """
+        Group operations on the current thread into one transaction.
+
+        Commits on normal exit and rolls back if the block raises.
+        Nested calls join the outermost transaction. The connection used
+        is pinned to the current thread until the block exits; on an
+        in-memory cache, other threads wait for it until then.
+
+        Example:
+            >>> with cache.transaction():
+            ...     cache.set("a", b"1")
+            ...     cache.delete("b")
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self
+            return
+
+        with self._borrow() as conn:
+            self._local.conn = conn
+            # Keys written in this transaction; None once the whole LRU is dirty
+            self._local.written = set()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    self._cache_invalidate()
+                    raise
+                conn.execute("COMMIT")
+            finally:
+                written = self._local.written
+                del self._local.conn
+                del self._local.written
+                # e.g. COMMIT failed with SQLITE_BUSY: never pool a
+                # connection that is still inside a transaction
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                    self._cache_invalidate()
+
+        # Until COMMIT, other threads still read the old values and may have
+        # cached them after the writes evicted them; evict again now that the
+        # new values are visible
+        if written is None:
+            self._cache_invalidate()
+        else:
+            for key in written:
+                self._cache_invalidate(key)
 
     def delete(self, key: str) -> None:
         """
@@ -137,8 +443,9 @@ class CacheClient:
             This is a soft delete. The value remains in the database
             for version history but is marked inactive.
         """
-        conn = self._get_conn()
-        _operations._delete_key(conn, key)
+        with self._borrow() as conn:
+            _operations._delete_key(conn, key)
+        self._cache_invalidate(key)
 
     def list_keys(self) -> list[str]:
         """
@@ -147,21 +454,60 @@ class CacheClient:
         Returns:
             List of all active key names, ordered by insertion time (newest first)
         """
-        conn = self._get_conn()
-        return _operations._list_active_keys(conn)
+        with self._borrow() as conn:
+            return _operations._list_active_keys(conn)
+
+    def list_keys_with_prefix(self, prefix: str) -> list[str]:
+        """
+        List active keys that start with prefix.
+
+        Returns:
+            Matching key names, ordered by insertion time (newest first)
+        """
+        with self._borrow() as conn:
+            return _operations._list_active_keys_with_prefix(conn, prefix)
+
+    def _cache_put(self, key: str, value: bytes, generation: int) -> None:
+        """Insert a freshly read value into the LRU, evicting the oldest entry."""
+        with self._read_cache_lock:
+            if generation != self._read_cache_generation:
+                return
+            self._read_cache[key] = value
+            if len(self._read_cache) > self._read_cache_size:
+                self._read_cache.popitem(last=False)
+
+    def _cache_invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key from the LRU, or all of it when key is None."""
+        if not self._read_cache_size:
+            return
+        if getattr(self._local, "conn", None) is not None:
+            # Remember the write so transaction() can evict it after COMMIT
+            if key is None:
+                self._local.written = None
+            elif self._local.written is not None:
+                self._local.written.add(key)
+        with self._read_cache_lock:
+            self._read_cache_generation += 1
+            if key is None:
+                self._read_cache.clear()
+            else:
+                self._read_cache.pop(key, None)
 
     def close(self) -> None:
         """
-        Close the thread-local database connection.
+        Close all idle pooled connections.
 
         Note:
-            This only closes the connection for the current thread.
-            Other threads' connections remain open.
+            A file-backed client reconnects on next use. An in-memory
+            client's data is discarded and the client can no longer be used.
         """
-        conn = getattr(self._local, "conn", None)
-        if conn is not None:
-            conn.close()
-            del self._local.conn
+        if self._in_memory:
+            self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
     def __enter__(self) -> CacheClient:
         """Context manager entry."""
@@ -175,11 +521,22 @@ class CacheClient:
         return f"CacheClient(path={self.path!r})"
 
 
+def _check_value(value: Any) -> None:
+    """Raise TypeError unless value is bytes."""
+    if not isinstance(value, bytes):
+        raise TypeError(
+            f"Value must be bytes, got {type(value).__name__}. "
+            "Use value.encode() for strings or pickle.dumps() for objects."
+        )
+
+
 def memoize(key_prefix: Optional[str] = None):
     """
     Decorator to memoize function results in the global cache.
 
     Caches function results based on string representation of arguments.
+    Cache keys are "<prefix>:<blake2b digest of the argument reprs>", so they
+    stay short regardless of argument size.
     IMPORTANT: Only works for functions with str arguments and str return values.
 
     Args:
@@ -211,15 +568,19 @@ def memoize(key_prefix: Optional[str] = None):
         def wrapper(*args, **kwargs):
             # Simple key generation from args
             # This is intentionally basic - complex use cases should use CacheClient directly
+            digest = hashlib.blake2b(digest_size=16)
+            for a in args:
+                digest.update(repr(a).encode())
+                digest.update(b"\0")
             if kwargs:
-                key_parts = [prefix] + [repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
-            else:
-                key_parts = [prefix] + [repr(a) for a in args]
+                for k, v in sorted(kwargs.items()):
+                    digest.update(f"{k}={v!r}".encode())
+                    digest.update(b"\0")
 
-            cache_key = ":".join(key_parts)
+            cache_key = f"{prefix}:{digest.hexdigest()}"
 
             # Check cache
-            cache = _get_default_cache()
+            cache = _default_cache or _get_default_cache()
             cached = cache.get(cache_key, default=None)
 
             if cached is not None:
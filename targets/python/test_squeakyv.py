@@ -0,0 +1,380 @@
+"""Tests for the squeakyv Python client. Run with `python -m pytest`."""
+
+import re
+import sqlite3
+import threading
+
+import pytest
+
+from squeakyv import CacheClient, memoize
+from squeakyv import core
+
+
+def _stored_schema_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute(
+            "SELECT value FROM __metadata__ WHERE key = 'schema_version'"
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row is not None else None
+
+
+def _trace_statements(monkeypatch):
+    statements = []
+    connect = CacheClient._connect
+
+    def traced_connect(self):
+        conn = connect(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(CacheClient, "_connect", traced_connect)
+    return statements
+
+
+def test_fresh_database_gets_schema(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with CacheClient(path) as client:
+        client.set("a", b"1")
+    assert _stored_schema_version(path) == core._operations.SCHEMA_VERSION
+
+
+def test_warm_database_skips_schema(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    CacheClient(path).close()
+
+    statements = _trace_statements(monkeypatch)
+    CacheClient(path).close()
+
+    assert statements == [
+        "SELECT value FROM __metadata__ WHERE key = 'schema_version'"
+    ]
+
+
+def test_stale_schema_version_reruns_schema(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    CacheClient(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "UPDATE __metadata__ SET value = '0.9' WHERE key = 'schema_version'"
+        )
+    conn.close()
+
+    statements = _trace_statements(monkeypatch)
+    CacheClient(path).close()
+
+    assert any("CREATE TABLE IF NOT EXISTS kv" in stmt for stmt in statements)
+    assert _stored_schema_version(path) == core._operations.SCHEMA_VERSION
+    # once recorded, the next open is warm again
+    statements.clear()
+    CacheClient(path).close()
+    assert len(statements) == 1
+
+
+def test_get_many():
+    with CacheClient() as client:
+        client.set("a", b"alpha")
+        client.set("b", b"\x00\x01\xff")
+
+        assert client.get_many(["a", "b", "missing"]) == {
+            "a": b"alpha",
+            "b": b"\x00\x01\xff",
+        }
+        assert client.get_many([]) == {}
+
+
+def test_get_many_matches_get_for_text_rows():
+    # rows written by the bash or elisp targets are stored as TEXT
+    with CacheClient() as client:
+        with client._borrow() as conn:
+            conn.execute("INSERT INTO kv (key, value) VALUES ('t', 'hello')")
+
+        assert client.get_many(["t"]) == {"t": client.get("t")} == {"t": "hello"}
+
+
+def test_get_many_serves_and_fills_read_cache():
+    with CacheClient(read_cache_size=10) as client:
+        client.set("a", b"alpha")
+        client.set("b", b"beta")
+        assert client.get("a") == b"alpha"
+
+        assert client.get_many(["a", "b"]) == {"a": b"alpha", "b": b"beta"}
+        assert list(client._read_cache) == ["a", "b"]
+
+
+def test_list_keys_with_prefix():
+    with CacheClient() as client:
+        for key in ("user:1", "user:2", "users", "session:1", "世界:1"):
+            client.set(key, b"v")
+        client.delete("user:2")
+
+        assert client.list_keys_with_prefix("user:") == ["user:1"]
+        assert client.list_keys_with_prefix("世界") == ["世界:1"]
+        assert sorted(client.list_keys_with_prefix("")) == sorted(client.list_keys())
+
+
+def test_pool_size_must_be_positive():
+    with pytest.raises(ValueError):
+        CacheClient(pool_size=0)
+
+
+def test_pool_reuses_connections(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), pool_size=2) as client:
+        client.set("a", b"1")
+        conn = client._pool.get_nowait()
+        client._pool.put_nowait(conn)
+
+        client.get("a")
+        assert client._pool.get_nowait() is conn
+
+
+def test_pool_bounds_idle_connections(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), pool_size=2) as client:
+        barrier = threading.Barrier(4)
+
+        def worker(i):
+            # hold four connections at once, more than the pool keeps idle
+            with client._borrow():
+                barrier.wait()
+            client.set(f"key{i}", b"v")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert client._pool.qsize() == 2
+        assert sorted(client.list_keys()) == ["key0", "key1", "key2", "key3"]
+
+
+def test_in_memory_checkout_times_out(monkeypatch):
+    monkeypatch.setattr(core, "_BUSY_TIMEOUT", 0.05)
+    errors = []
+
+    def reader():
+        try:
+            client.get("a")
+        except sqlite3.OperationalError as exc:
+            errors.append(exc)
+
+    with CacheClient() as client:
+        with client.transaction():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            thread.join()
+
+    assert len(errors) == 1
+
+def test_transaction_commits():
+    with CacheClient() as client:
+        with client.transaction():
+            client.set("a", b"1")
+            client.set("b", b"2")
+        assert client.get_many(["a", "b"]) == {"a": b"1", "b": b"2"}
+
+
+def test_transaction_rolls_back_on_error():
+    with CacheClient() as client:
+        client.set("a", b"old")
+        with pytest.raises(RuntimeError):
+            with client.transaction():
+                client.set("a", b"new")
+                client.set("b", b"2")
+                raise RuntimeError("boom")
+        assert client.get("a") == b"old"
+        assert client.get("b") is None
+
+
+def test_nested_transaction_joins_outer():
+    with CacheClient() as client:
+        with pytest.raises(RuntimeError):
+            with client.transaction():
+                with client.transaction():
+                    client.set("a", b"1")
+                raise RuntimeError("boom")
+        assert client.get("a") is None
+
+
+def test_set_many_is_atomic():
+    with CacheClient() as client:
+        with pytest.raises(TypeError):
+            client.set_many([("a", b"1"), ("b", "not bytes")])
+        assert client.list_keys() == []
+
+def _schema_objects(client):
+    with client._borrow() as conn:
+        return conn.execute(
+            "SELECT type, name, sql FROM sqlite_master ORDER BY type, name"
+        ).fetchall()
+
+
+def test_bulk_load():
+    with CacheClient() as client:
+        client.set("a", b"old")
+        before = _schema_objects(client)
+        client.bulk_load([("a", b"1"), ("b", b"2"), ("b", b"3")])
+
+        assert client.get_many(["a", "b"]) == {"a": b"1", "b": b"3"}
+        with client._borrow() as conn:
+            (active,) = conn.execute(
+                "SELECT count(*) FROM kv WHERE key = 'a' AND is_active = 1"
+            ).fetchone()
+        assert active == 1
+        # every post-load index and trigger is recreated as it was
+        assert _schema_objects(client) == before
+
+        client.set("a", b"2")
+        assert client.get("a") == b"2"
+
+
+def test_bulk_load_empty_runs_nothing():
+    statements = []
+    with CacheClient() as client:
+        with client._borrow() as conn:
+            conn.set_trace_callback(statements.append)
+        client.bulk_load([])
+
+    assert statements == []
+
+
+def test_bulk_load_rejects_non_bytes():
+    with CacheClient() as client:
+        client.set("a", b"old")
+        with pytest.raises(TypeError):
+            client.bulk_load([("a", b"1"), ("b", "not bytes")])
+        assert client.get("a") == b"old"
+        assert client.get("b") is None
+
+
+def _read_during_transaction(client, write):
+    """Run write() in a transaction on another thread, reading "k" mid-way."""
+    written = threading.Event()
+    read = threading.Event()
+
+    def writer():
+        with client.transaction():
+            write()
+            written.set()
+            read.wait()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    written.wait()
+    during = client.get("k")
+    read.set()
+    thread.join()
+    return during
+
+
+def test_read_cache_sees_commit_from_other_thread(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), read_cache_size=10) as client:
+        client.set("k", b"old")
+
+        during = _read_during_transaction(client, lambda: client.set("k", b"new"))
+
+        assert during == b"old"
+        assert client.get("k") == b"new"
+
+
+def test_transaction_reads_own_write_past_read_cache(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), read_cache_size=10) as client:
+        client.set("k", b"old")
+
+        with client.transaction():
+            client.set("k", b"new")
+            # another thread re-caches the still-committed old value
+            thread = threading.Thread(target=client.get, args=("k",))
+            thread.start()
+            thread.join()
+            assert client._read_cache["k"] == b"old"
+
+            assert client.get("k") == b"new"
+            assert client.get_many(["k"]) == {"k": b"new"}
+
+        assert client.get("k") == b"new"
+
+
+def test_read_cache_sees_set_many_from_other_thread(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), read_cache_size=10) as client:
+        client.set("k", b"old")
+
+        _read_during_transaction(client, lambda: client.set_many([("k", b"new")]))
+
+        assert client.get("k") == b"new"
+
+
+def test_read_cache_sees_nested_bulk_load_from_other_thread(tmp_path):
+    with CacheClient(str(tmp_path / "cache.db"), read_cache_size=10) as client:
+        client.set("k", b"old")
+
+        _read_during_transaction(client, lambda: client.bulk_load([("k", b"new")]))
+
+        assert client.get("k") == b"new"
+
+
+def test_read_cache_keeps_value_after_rollback():
+    with CacheClient(read_cache_size=10) as client:
+        client.set("k", b"old")
+        with pytest.raises(RuntimeError):
+            with client.transaction():
+                client.set("k", b"new")
+                assert client.get("k") == b"new"
+                raise RuntimeError("boom")
+        assert client.get("k") == b"old"
+
+
+@pytest.fixture
+def memo_cache(monkeypatch):
+    with CacheClient() as client:
+        monkeypatch.setattr(core, "_default_cache", client)
+        yield client
+
+
+def test_memoize_key_format(memo_cache):
+    @memoize(key_prefix="greet")
+    def greet(name):
+        return f"hello {name}"
+
+    greet("x" * 10_000)
+
+    (key,) = memo_cache.list_keys()
+    assert re.fullmatch(r"greet:[0-9a-f]{32}", key)
+
+
+def test_memoize_keys_distinguish_args_and_kwargs(memo_cache):
+    @memoize(key_prefix="join")
+    def join(*args, **kwargs):
+        return repr((args, sorted(kwargs.items())))
+
+    join("a", "b")
+    join("ab")
+    join("a", sep="b")
+    join("a", sep="c")
+    join("a", end="b")
+    join(sep="b", end="c")
+    join(end="c", sep="b")
+
+    assert len(memo_cache.list_keys()) == 6
+
+
+def test_memoize_hit_returns_cached_str(memo_cache):
+    calls = []
+
+    @memoize()
+    def compute(arg):
+        calls.append(arg)
+        return f"result {arg}"
+
+    assert compute("a") == "result a"
+    assert compute("a") == "result a"
+    assert isinstance(compute("a"), str)
+    assert calls == ["a"]
+    (key,) = memo_cache.list_keys()
+    # the default prefix is the function's qualified name
+    assert key.startswith(f"{__name__}.{test_memoize_hit_returns_cached_str.__name__}")
+    assert key.split(":")[0].endswith(".<locals>.compute")
+